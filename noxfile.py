@@ -4,59 +4,153 @@
 
 from __future__ import annotations
 
+import collections
+import concurrent.futures
 import fnmatch
+import json
+import operator
 import os
 import pathlib
 import re
 import shutil
 import subprocess
+import tempfile
 import typing as t
 
 import nox
+import packaging.requirements
 
-updater: list[str] = []
-"""Sessions which update the source code."""
-checker: list[str] = []
-"""Sessions which check the source code."""
-special: list[str] = []
-"""Sessions which have their own requirements but are not in the updater or checker list."""
+SESSIONS: dict[str, str] = {}
+"""Session names mapped to their category: 'updater' sessions update the source code, 'checker' sessions check it, 'special' sessions do neither."""
 
 PIP_OPTIONS = ('--disable-pip-version-check',)
+
+PIP_ENV = dict(
+    PIP_CACHE_DIR=str(pathlib.Path('.nox', '.pip-cache').absolute()),
+)
+"""Environment variables pointing pip at a cache shared by all sessions, so repeated installs become cache hits."""
+
+FREEZE_SCRIPT = (
+    'import importlib.metadata; '
+    'print("\\n".join(sorted((f"{d.metadata[\'Name\']}=={d.version}" for d in importlib.metadata.distributions()'
+    ' if d.metadata["Name"] not in ("pip", "setuptools", "wheel")), key=str.lower)))'
+)
+"""Script which emits pinned requirements for the installed distributions, replacing a pip freeze subprocess."""
 F = t.TypeVar("F", bound=t.Callable[..., t.Any])
 
+_find_cache: dict[str, list[str]] = {}
+"""Results from Helper.find keyed by pattern, shared by all sessions in a single nox invocation."""
+
+_installed: dict[str, bool] = {}
+"""Whether the package is known to be installed, keyed by session bin path, to skip redundant probes within one nox invocation."""
+
+_IGNORE_DIR_RE = re.compile(r'^(?:\.|__|dist$)')
+"""Combined pattern matching directory names which Helper.find will not descend into."""
+
+_DIR_EXCEPTIONS = frozenset({'.azure-pipelines'})
+"""Directory names which Helper.find descends into even though they match the ignore pattern."""
+
+_SUFFIX_GLOB_RE = re.compile(r'^\*(\.[A-Za-z0-9]+)$')
+"""Pattern matching globs which are a simple suffix match, allowing Helper.find to use str.endswith instead of a regex."""
+
 
-def track(tracker: list[str], name: str | None = None) -> t.Callable[[F], F]:
-    """Record the decorated function with the given tracker."""
+def track(category: str, name: str | None = None) -> t.Callable[[F], F]:
+    """Record the decorated function under the given category."""
 
     def impl(func: F) -> F:
         """Record the decorated function."""
-        tracker.append(name or func.__name__)
+        SESSIONS[name or func.__name__] = category
         return func
 
     return impl
 
 
+def tracked(*categories: str) -> list[str]:
+    """Return the names of the sessions recorded under the given categories."""
+    return [name for name, category in SESSIONS.items() if category in categories]
+
+
 @nox.session(reuse_venv=True)
 def reformat(session: nox.Session) -> None:
     """Reformat code."""
-    for target in updater:
+    for target in tracked('updater'):
         session.notify(target, posargs=[Helper.REFORMAT])
 
 
 @nox.session()
 def freeze(session: nox.Session) -> None:
     """Freeze test requirements."""
-    for target in updater + checker + special:
-        venv_path = pathlib.Path(session.bin).parent.parent.joinpath(target)
+    targets = list(SESSIONS)
+
+    venv_paths = [venv_path for target in targets if (venv_path := pathlib.Path(session.bin).parent.parent.joinpath(target)).is_dir()]
 
-        if venv_path.is_dir():
-            shutil.rmtree(venv_path)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        # venv removal is IO bound serial work, so overlap it across venvs
+        list(executor.map(lambda venv_path: shutil.rmtree(venv_path, ignore_errors=True), venv_paths))
 
+    if os.environ.get('CONTAINMINT_NOX_BATCH_FREEZE'):
+        batch_freeze(session, targets)
+        return
+
+    for target in targets:
         session.notify(target, posargs=[Helper.FREEZE])
 
 
+def batch_freeze(session: nox.Session, targets: list[str]) -> None:
+    """Install the union of all target requirements with a single pip invocation and write per-target freeze files from the resolved set."""
+    list_distributions = (
+        'import importlib.metadata, json; '
+        "print(json.dumps([dict(name=d.metadata['Name'], version=d.version, requires=d.requires or []) for d in importlib.metadata.distributions()]))"
+    )
+
+    top_level: dict[str, list[str]] = {}
+
+    for target in targets:
+        requirements_path = f'test/requirements/{target}.in'
+
+        if os.path.isfile(requirements_path):
+            with open(requirements_path, encoding='utf-8') as requirements_file:
+                top_level[target] = [line.strip() for line in requirements_file if line.strip()]
+
+    with tempfile.NamedTemporaryFile('w', prefix='requirements-', suffix='.in') as merged_file:
+        merged_file.write('\n'.join(sorted(set().union(*top_level.values()))) + '\n')
+        merged_file.flush()
+
+        session.install('-r', merged_file.name, *PIP_OPTIONS, silent=False, env=PIP_ENV)
+
+    distributions = json.loads(str(session.run('python', '-c', list_distributions, silent=True)))
+
+    def canonical(name: str) -> str:
+        """Return the canonical form of the given distribution name."""
+        return re.sub(r'[-_.]+', '-', name).lower()
+
+    def applicable(entries: list[str]) -> list[str]:
+        """Return the canonical names of the given requirements which apply to the current environment, skipping extra-gated and marker-excluded entries."""
+        requirements = [packaging.requirements.Requirement(entry) for entry in entries]
+
+        return [canonical(requirement.name) for requirement in requirements if requirement.marker is None or requirement.marker.evaluate({'extra': ''})]
+
+    names = {canonical(dist['name']): dist['name'] for dist in distributions}
+    versions = {canonical(dist['name']): dist['version'] for dist in distributions}
+    requires = {canonical(dist['name']): applicable(dist['requires']) for dist in distributions}
+
+    for target, requirements in top_level.items():
+        queue = applicable(requirements)
+        closure: set[str] = set()
+
+        while queue:
+            name = queue.pop()
+
+            if name in versions and name not in closure:
+                closure.add(name)
+                queue.extend(requires[name])
+
+        with open(f'test/requirements/{target}.txt', 'w', encoding='utf-8') as freeze_file:
+            freeze_file.write('\n'.join(f'{names[name]}=={versions[name]}' for name in sorted(closure)) + '\n')
+
+
 @nox.session(reuse_venv=True, name='nox')
-@track(special, name='nox')
+@track('special', name='nox')
 def _nox(session: nox.Session) -> None:
     """Freeze nox requirements."""
     session.posargs.append(Helper.FREEZE)
@@ -64,80 +158,85 @@ def _nox(session: nox.Session) -> None:
 
 
 @nox.session(reuse_venv=True)
-@track(updater)
+@track('updater')
 def black(session: nox.Session) -> None:
     """Run black."""
-    helper = Helper(session)
-    session.run('black', *([] if helper.update else ['--check', '--diff']), *helper.find('*.py'))
+    run_black(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(updater)
+@track('updater')
 def isort(session: nox.Session) -> None:
     """Run isort."""
-    helper = Helper(session)
-    session.run('isort', *([] if helper.update else ['--check-only']), *helper.find('*.py'))
+    run_isort(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(updater)
+@track('updater')
 def docformatter(session: nox.Session) -> None:
     """Run docformatter."""
-    helper = Helper(session)
-    options = ['--pre-summary-newline', '--wrap-summaries', '0', '--wrap-descriptions', '0']
-    session.run('docformatter', *(['--in-place'] if helper.update else ['--check']), *options, *helper.find('*.py'))
+    run_docformatter(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(checker)
+@track('checker')
 def pylint(session: nox.Session) -> None:
     """Run pylint."""
-    helper = Helper(session)
-    session.run('pylint', *helper.find('*.py'))
+    run_pylint(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(checker)
+@track('checker')
 def mypy(session: nox.Session) -> None:
     """Run mypy."""
-    helper = Helper(session)
-    session.run('mypy', *helper.find('*.py'))
+    run_mypy(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(checker)
+@track('checker')
 def yamllint(session: nox.Session) -> None:
     """Run yamllint."""
-    helper = Helper(session)
-    session.run('yamllint', '--strict', *helper.find('*.yml'))
+    run_yamllint(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(checker)
+@track('checker')
 def doc8(session: nox.Session) -> None:
     """Run doc8."""
-    helper = Helper(session)
-    session.run('doc8', *helper.find('*.rst'))
+    run_doc8(Helper(session))
 
 
 @nox.session(reuse_venv=True)
-@track(checker)
+@track('checker')
 def rstcheck(session: nox.Session) -> None:
     """Run rstcheck."""
+    run_rstcheck(Helper(session))
+
+
+@nox.session(reuse_venv=True)
+@track('special')
+def lint(session: nox.Session) -> None:
+    """Run all lint tools from a single shared venv."""
     helper = Helper(session)
-    session.run('rstcheck', *helper.find('*.rst'))
+
+    for run_tool in (run_black, run_isort, run_docformatter, run_pylint, run_mypy, run_yamllint, run_doc8, run_rstcheck):
+        run_tool(helper)
 
 
 @nox.session(reuse_venv=True)
-@track(special)
+@track('special')
 def pytest(session: nox.Session) -> None:
     """Run pytest."""
     helper = Helper(session)
 
-    process = subprocess.run([os.path.join(session.bin, 'python'), '-c', 'import ansible'], stdin=subprocess.DEVNULL, capture_output=True, check=False)
+    if not _installed.get(session.bin):
+        marker = install_marker(session)
 
-    if process.returncode:
-        session.install(*PIP_OPTIONS, '-e', '.', silent=False)
+        if not marker.exists():
+            session.install(*PIP_OPTIONS, '-e', '.', silent=False, env=PIP_ENV)
+            marker.touch()
+
+        _installed[session.bin] = True
 
     env = dict(
         CONTAINMINT_='',  # ensure the environment fixture always has something to delete
@@ -151,7 +250,7 @@ def pytest(session: nox.Session) -> None:
 
 
 @nox.session(reuse_venv=True)
-@track(special)
+@track('special')
 def build(session: nox.Session) -> None:
     """Build the package."""
     Helper(session)
@@ -164,6 +263,11 @@ def build(session: nox.Session) -> None:
     session.run('flit', 'build')
 
 
+def install_marker(session: nox.Session) -> pathlib.Path:
+    """Return the marker path recording that the package has been installed into the given session's venv."""
+    return pathlib.Path(session.bin, '.containmint-installed')
+
+
 @nox.session(reuse_venv=False)
 def validate(session: nox.Session) -> None:
     """Run pytest using the built wheel."""
@@ -177,7 +281,8 @@ def validate(session: nox.Session) -> None:
     helper = Helper(session)
     helper.install('pytest')
 
-    session.install(*PIP_OPTIONS, wheel, silent=False)
+    session.install(*PIP_OPTIONS, wheel, silent=False, env=PIP_ENV)
+    install_marker(session).touch()
 
     pytest(session)
 
@@ -185,13 +290,81 @@ def validate(session: nox.Session) -> None:
 @nox.session(reuse_venv=True, name='all')
 def _all(session: nox.Session) -> None:
     """Run all tests (default, build, validate)."""
-    for target in nox.options.sessions:
-        session.notify(target)
+    sessions: list[str] = nox.options.sessions or []
+
+    if os.environ.get('CONTAINMINT_NOX_PARALLEL'):
+        run_sessions_parallel(session, sessions)
+    else:
+        for target in sessions:
+            session.notify(target)
 
     session.notify('build')
     session.notify('validate')
 
 
+def run_sessions_parallel(session: nox.Session, targets: list[str]) -> None:
+    """Run the given independent sessions concurrently in child nox processes, reporting output and failures once all have completed."""
+
+    def run_target(target: str) -> subprocess.CompletedProcess:
+        """Run the given session in a child nox process."""
+        return subprocess.run(['nox', '-s', target], check=False, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(targets)) as executor:
+        processes = list(executor.map(run_target, targets))
+
+    failed = []
+
+    for target, process in zip(targets, processes):
+        print(process.stdout, end='', flush=True)
+
+        if process.returncode:
+            failed.append(target)
+
+    if failed:
+        session.error(f'Parallel sessions failed: {", ".join(failed)}')
+
+
+def run_black(helper: Helper) -> None:
+    """Run black."""
+    helper.session.run('black', *([] if helper.update else ['--check', '--diff']), *helper.find('*.py'))
+
+
+def run_isort(helper: Helper) -> None:
+    """Run isort."""
+    helper.session.run('isort', *([] if helper.update else ['--check-only']), *helper.find('*.py'))
+
+
+def run_docformatter(helper: Helper) -> None:
+    """Run docformatter."""
+    options = ['--pre-summary-newline', '--wrap-summaries', '0', '--wrap-descriptions', '0']
+    helper.session.run('docformatter', *(['--in-place'] if helper.update else ['--check']), *options, *helper.find('*.py'))
+
+
+def run_pylint(helper: Helper) -> None:
+    """Run pylint."""
+    helper.session.run('pylint', *helper.find('*.py'))
+
+
+def run_mypy(helper: Helper) -> None:
+    """Run mypy."""
+    helper.session.run('mypy', *helper.find('*.py'))
+
+
+def run_yamllint(helper: Helper) -> None:
+    """Run yamllint."""
+    helper.session.run('yamllint', '--strict', *helper.find('*.yml'))
+
+
+def run_doc8(helper: Helper) -> None:
+    """Run doc8."""
+    helper.session.run('doc8', *helper.find('*.rst'))
+
+
+def run_rstcheck(helper: Helper) -> None:
+    """Run rstcheck."""
+    helper.session.run('rstcheck', *helper.find('*.rst'))
+
+
 class Helper:
     """Session helper."""
 
@@ -212,48 +385,47 @@ class Helper:
 
         if os.path.isfile(requirements_path):
             if self.FREEZE in self.session.posargs:
-                self.session.install('-r', requirements_path, *PIP_OPTIONS, silent=False)
+                self.session.install('-r', requirements_path, *PIP_OPTIONS, silent=False, env=PIP_ENV)
 
-                pip = os.path.join(self.session.bin, 'pip')
+                output = str(self.session.run('python', '-c', FREEZE_SCRIPT, silent=True))
 
-                with open(freeze_path, 'wb') as freeze_file:
-                    subprocess.run([pip, 'freeze', *PIP_OPTIONS], check=True, stdin=subprocess.DEVNULL, stdout=freeze_file, stderr=subprocess.PIPE)
+                with open(freeze_path, 'w', encoding='utf-8') as freeze_file:
+                    freeze_file.write(output.strip() + '\n')
             else:
-                self.session.install('-r', freeze_path, *PIP_OPTIONS)
+                self.session.install('-r', freeze_path, *PIP_OPTIONS, env=PIP_ENV)
 
         if self.FREEZE in self.session.posargs:
             self.session.skip()
 
-    def find(self, pattern: str) -> list[str]:
-        """Return a list of paths matching the following pattern after excluding unwanted paths."""
-        dir_exceptions = ('.azure-pipelines',)
-
-        ignore_dir_patterns = [
-            re.compile(pattern)
-            for pattern in (
-                r'^\.',
-                r'^__',
-                r'^dist$',
-            )
-        ]
+    def iter_find(self, pattern: str) -> t.Iterator[str]:
+        """Yield paths matching the given pattern as they are found, excluding unwanted paths, in traversal order."""
+        if suffix_glob := _SUFFIX_GLOB_RE.match(pattern):
+            matcher: t.Callable[[str], t.Any] = operator.methodcaller('endswith', suffix_glob.group(1))  # pure C suffix check for the common '*.ext' shape
+        else:
+            # patterns used here contain no path separators, so matching the base name alone is sufficient
+            matcher = re.compile(fnmatch.translate(pattern)).match
+
+        stack = collections.deque(['.'])
+
+        while stack:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not _IGNORE_DIR_RE.match(entry.name) or entry.name in _DIR_EXCEPTIONS:
+                            stack.append(entry.path)
+                    elif entry.is_file() and matcher(entry.name):
+                        yield entry.path[2:]  # strip the leading './'
 
-        paths = []
-
-        for dir_path, dir_names, file_names in os.walk('.', topdown=True):
-            ignore_dirs = [
-                dir_name for dir_name in dir_names if any(pattern.search(dir_name) for pattern in ignore_dir_patterns) and dir_name not in dir_exceptions
-            ]
-
-            for ignore_dir in ignore_dirs:
-                dir_names.remove(ignore_dir)
-
-            paths.extend(fnmatch.filter((os.path.join(dir_path[2:], file_name) for file_name in file_names), pattern))
-
-        paths = sorted(paths)
+    def find(self, pattern: str) -> list[str]:
+        """Return a sorted list of paths matching the following pattern after excluding unwanted paths."""
+        if (paths := _find_cache.get(pattern)) is None:
+            paths = list(self.iter_find(pattern))
+            paths.sort()
+            _find_cache[pattern] = paths
 
         self.session.debug(f'{pattern} -> {" ".join(paths)}')
 
         return paths
 
 
-nox.options.sessions = updater + checker
+nox.options.sessions = tracked('updater', 'checker')
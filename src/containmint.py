@@ -8,9 +8,12 @@ from __future__ import annotations
 
 import abc
 import argparse
+import atexit
+import concurrent.futures
 import contextlib
 import dataclasses
-import itertools
+import fnmatch
+import functools
 import json
 import os
 import pathlib
@@ -43,6 +46,8 @@ UTF8 = 'utf-8'
 INVENTORY_HOST = 'testhost'
 ENGINE_LINK = '/tmp/containmint-engine'
 
+TarFilter = t.Callable[[tarfile.TarInfo], t.Optional[tarfile.TarInfo]]
+
 
 @dataclasses.dataclass(frozen=True)  # type: ignore  # mypy bug: https://github.com/python/mypy/issues/5374
 class Command(metaclass=abc.ABCMeta):
@@ -53,6 +58,11 @@ class Command(metaclass=abc.ABCMeta):
         """Name of the command on the CLI."""
         return cls.__name__.lower()
 
+    @property
+    def state(self) -> dict[str, t.Any]:
+        """The fields of this command to show in output, excluding any marked repr=False."""
+        return {field.name: getattr(self, field.name) for field in dataclasses.fields(self) if field.repr}
+
     @abc.abstractmethod
     def run(self) -> None:
         """Run the CLI command."""
@@ -68,6 +78,8 @@ class BuildCommand(Command, metaclass=abc.ABCMeta):
     login: bool
     squash: t.Optional[str]
     build_args: t.Optional[list[str]]
+    no_cache: t.Optional[bool]
+    """Use of the engine build cache: True to disable, False to enable, None to decide based on instance reuse."""
 
 
 @dataclasses.dataclass(frozen=True)
@@ -77,6 +89,8 @@ class Build(BuildCommand):
     keep_instance: bool
     remote: str
     arch: str
+    compress_level: int
+    stream: bool
 
     def run(self) -> None:
         """Run the CLI command."""
@@ -92,6 +106,8 @@ class Build(BuildCommand):
             push=self.push,
             squash=self.squash,
             build_args=self.build_args,
+            # a kept instance sees repeated builds, so let the engine reuse layers there unless the user said otherwise
+            no_cache=self.no_cache if self.no_cache is not None else not self.keep_instance,
         )
 
         ansible_test_shell = ('ansible-test', 'shell', '--target-posix', f'remote:{self.remote},arch={self.arch}', '--color', '-v', '--truncate', '0')
@@ -101,50 +117,151 @@ class Build(BuildCommand):
             process = run_command('ansible-inventory', '-i', inventory_file.name, '--host', INVENTORY_HOST, capture=True)
             inventory_vars = json.loads(process.stdout)
             remote_python_interpreter = inventory_vars['ansible_python_interpreter']
+            ssh = SshConnection.create(inventory_vars)
 
-            self.upload_payload(remote_workdir=remote_workdir, workdir_name=workdir_name, inventory=inventory_file.name, execute=execute)
+            self.upload_payload(remote_workdir=remote_workdir, workdir_name=workdir_name, inventory=inventory_file.name, execute=execute, ssh=ssh)
 
-            options = []
+            if self.keep_instance and ssh:
+                # run the remote program directly, skipping the startup cost of a second ansible-test invocation
+                run_command(*ssh.command(shlex.join([remote_python_interpreter, remote_program, Dispatch.cli_name()])))
+            else:
+                # ansible-test is required to apply the --remote-terminate semantics
+                options = []
 
-            if not self.keep_instance:
-                options.extend(['--remote-terminate', 'always'])
+                if not self.keep_instance:
+                    options.extend(['--remote-terminate', 'always'])
 
-            run_command(*ansible_test_shell, *options, '--raw', '--', remote_python_interpreter, remote_program, Dispatch.cli_name())
+                run_command(*ansible_test_shell, *options, '--raw', '--', remote_python_interpreter, remote_program, Dispatch.cli_name())
 
-    def upload_payload(self, remote_workdir: str, workdir_name: str, inventory: str, execute: Execute) -> None:
+    def upload_payload(self, remote_workdir: str, workdir_name: str, inventory: str, execute: Execute, ssh: SshConnection | None) -> None:
         """
         Generate and upload the payload to the remote host.
 
         The payload contains this program, the build configuration and the build context.
         """
-        ansible_env = os.environ.copy()
-        ansible_env.update(
-            ANSIBLE_DEVEL_WARNING='no',
-            ANSIBLE_HOST_KEY_CHECKING='no',
-            ANSIBLE_FORCE_COLOR='yes',
-        )
-
         with tempfile.NamedTemporaryFile(prefix='config-', suffix='.json') as config_file:
             execute.serialize(config_file.name)
 
-            with tempfile.NamedTemporaryFile(prefix='content-', suffix='.tgz') as archive_file:
-                with tarfile.open(archive_file.name, "w:gz") as tar:
-                    tar.add(__file__, arcname=os.path.join(workdir_name, PROGRAM_NAME))
-                    tar.add(config_file.name, arcname=os.path.join(workdir_name, CONFIG_NAME))
-                    tar.add(self.context, arcname=os.path.join(workdir_name, CONTEXT_NAME))
+            payload = {
+                os.path.join(workdir_name, PROGRAM_NAME): __file__,
+                os.path.join(workdir_name, CONFIG_NAME): config_file.name,
+                os.path.join(workdir_name, CONTEXT_NAME): self.context,
+            }
+
+            tar_filter = self.payload_filter(workdir_name)
+
+            if self.stream and ssh:
+                self.stream_payload(remote_workdir=remote_workdir, payload=payload, ssh=ssh, tar_filter=tar_filter)
+            else:
+                self.archive_payload(remote_workdir=remote_workdir, payload=payload, inventory=inventory, ssh=ssh, tar_filter=tar_filter)
+
+    def payload_filter(self, workdir_name: str) -> TarFilter:
+        """Return a tar filter which omits ignored context entries and normalizes metadata so archives are reproducible and compress well."""
+        patterns: list[str] = []
+
+        for name in ('.containerignore', '.dockerignore'):
+            ignore_path = os.path.join(self.context, name)
+
+            if os.path.isfile(ignore_path):
+                with open(ignore_path, encoding=UTF8) as ignore_file:
+                    lines = (line.strip() for line in ignore_file)
+                    patterns = [line.rstrip('/') for line in lines if line and not line.startswith('#')]
+
+                break
+
+        context_prefix = os.path.join(workdir_name, CONTEXT_NAME) + '/'
+
+        def tar_filter(item: tarfile.TarInfo) -> t.Optional[tarfile.TarInfo]:
+            """Drop ignored context entries and zero out metadata which would otherwise vary between runs."""
+            if patterns and item.name.startswith(context_prefix):
+                relative = item.name[len(context_prefix) :]
+
+                if any(fnmatch.fnmatch(relative, pattern) for pattern in patterns):
+                    return None  # returning None for a directory also prunes everything below it
+
+            item.uid = item.gid = 0
+            item.uname = item.gname = ''
+            item.mtime = 0
+
+            return item
+
+        return tar_filter
+
+    def stream_payload(self, remote_workdir: str, payload: dict[str, str], ssh: SshConnection, tar_filter: TarFilter) -> None:
+        """Stream the payload to the remote host over SSH, overlapping compression, transfer and extraction."""
+        extract = f'tar -x{"z" if self.compress_level else ""}f - -C {shlex.quote(os.path.dirname(remote_workdir))}'
+        command = ssh.command(extract)
+
+        display.subsection(f'Run command: {shlex.join(command)}')
+
+        compressor = find_compressor() if self.compress_level else None
+
+        if self.compress_level and not compressor:
+            tar_args: dict[str, t.Any] = dict(mode='w|gz', compresslevel=self.compress_level)
+        else:
+            tar_args = dict(mode='w|')  # compression is disabled or handled by the external compressor
+
+        with subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, bufsize=1 << 18) as process:  # large buffer to cut per-write syscalls
+            with contextlib.ExitStack() as stack:
+                stdin = t.cast(t.IO[bytes], process.stdin)
+
+                if compressor:
+                    compress_process = stack.enter_context(
+                        subprocess.Popen([str(compressor), f'-{self.compress_level}'], stdin=subprocess.PIPE, stdout=stdin, bufsize=1 << 18)
+                    )
+
+                    stdin.close()  # the compressor now owns the write end of the ssh pipe
+                    stdin = t.cast(t.IO[bytes], compress_process.stdin)
+
+                with contextlib.suppress(BrokenPipeError):  # a failed ssh process is reported below using the exit status
+                    with tarfile.open(fileobj=stdin, **tar_args) as tar:
+                        for arcname, path in payload.items():
+                            tar.add(path, arcname=arcname, filter=tar_filter)
+
+                    stdin.close()
+
+        if process.returncode:
+            raise SubprocessError(SubprocessResult(command=command, stdout='', stderr='', status=process.returncode))
+
+    def archive_payload(self, remote_workdir: str, payload: dict[str, str], inventory: str, ssh: SshConnection | None, tar_filter: TarFilter) -> None:
+        """Upload the payload to the remote host as a staged archive, using scp when possible and ansible otherwise."""
+        if self.compress_level:
+            tar_args: dict[str, t.Any] = dict(mode='w:gz', compresslevel=self.compress_level)
+        else:
+            tar_args = dict(mode='w')  # level 0 disables compression entirely
+
+        with tempfile.NamedTemporaryFile(prefix='content-', suffix='.tgz') as archive_file:
+            with open(archive_file.name, 'wb', buffering=1 << 20) as buffered_file:  # large buffer to cut per-write syscalls
+                with tarfile.open(fileobj=buffered_file, **tar_args) as tar:
+                    for arcname, path in payload.items():
+                        tar.add(path, arcname=arcname, filter=tar_filter)
+
+            if ssh:
+                remote_archive = f'/tmp/containmint-payload-{secrets.token_hex(4)}.tgz'
+                extract = (
+                    f'tar -x{"z" if self.compress_level else ""}f {shlex.quote(remote_archive)}'
+                    f' -C {shlex.quote(os.path.dirname(remote_workdir))} && rm {shlex.quote(remote_archive)}'
+                )
+
+                run_command(*ssh.scp_command(archive_file.name, remote_archive))
+                run_command(*ssh.command(extract))
+            else:
+                ansible_env = dict(
+                    os.environ,
+                    ANSIBLE_DEVEL_WARNING='no',
+                    ANSIBLE_HOST_KEY_CHECKING='no',
+                    ANSIBLE_FORCE_COLOR='yes',
+                    ANSIBLE_SSH_PIPELINING='yes',
+                    ANSIBLE_SSH_ARGS=SshConnection.SSH_ARGS,
+                )
 
                 module_args = dict(
                     src=archive_file.name,
                     dest=os.path.dirname(remote_workdir),
                 )
 
-                ansible_options = {
-                    '-m': 'unarchive',
-                    '-a': ' '.join(f'{key}={value}' for key, value in module_args.items()),
-                    '-i': inventory,
-                }
-
-                ansible_unarchive = ['ansible'] + list(itertools.chain.from_iterable(ansible_options.items())) + [INVENTORY_HOST]
+                module_args_str = ' '.join(f'{key}={value}' for key, value in module_args.items())
+                ansible_unarchive = ['ansible', '-m', 'unarchive', '-a', module_args_str, '-i', inventory, INVENTORY_HOST]
 
                 run_command(*ansible_unarchive, env=ansible_env, capture=True)
 
@@ -195,8 +312,7 @@ class Execute(BuildCommand):
         """Run the CLI command."""
         image = ImageReference.parse(self.tag)
 
-        paths = [os.path.join(self.context, name) for name in CONTAINER_FILES]
-        match = [path for path in paths if os.path.isfile(path)][0]
+        match = find_container_file(self.context)
 
         credentials = RegistryCredentials(self.username, self.password) if self.login else None
 
@@ -216,8 +332,11 @@ class Execute(BuildCommand):
         for build_arg in self.build_args or []:
             options.extend(('--build-arg', build_arg))
 
+        if self.no_cache or self.no_cache is None:  # cache use must be explicitly requested
+            options.append('--no-cache')
+
         with registry_login(image.server, credentials):
-            engine.run('build', '--tag', self.tag, '--file', match, self.context, '--no-cache', *options)
+            engine.run('build', '--tag', self.tag, '--file', match, self.context, *options)
 
             if self.push:
                 engine.run('push', self.tag)
@@ -232,6 +351,11 @@ class Merge(Command):
     push: bool
     login: bool
 
+    _created: set[str] = dataclasses.field(default_factory=set, init=False, repr=False, compare=False)
+    """Tags for which a manifest list has been created, to avoid repeating the work when merge is retried."""
+    _pushed: set[str] = dataclasses.field(default_factory=set, init=False, repr=False, compare=False)
+    """Tags which have been pushed, to avoid repeating the work when merge is retried."""
+
     def run(self) -> None:
         """Run the CLI command."""
         server = get_server(self.tags + self.sources)
@@ -247,20 +371,35 @@ class Merge(Command):
             self.merge()
 
     def merge(self) -> None:
-        """Create and push manifest lists."""
+        """Create and push manifest lists, skipping work completed by an earlier attempt."""
         for tag in self.tags:
-            with contextlib.suppress(SubprocessError):
-                engine.run('manifest', 'rm', tag)
+            if tag not in self._created:
+                with contextlib.suppress(SubprocessError):
+                    engine.run('manifest', 'rm', tag)
 
-            engine.run('manifest', 'create', tag, *self.sources)
+                engine.run('manifest', 'create', tag, *self.sources)
+                self._created.add(tag)
 
-            if self.push:
-                options = (f'docker://{tag}',) if engine.program.name == 'podman' else ()
+        if not self.push:
+            return
+
+        def push_tag(tag: str) -> t.Optional[SubprocessError]:
+            """Push the manifest list for the given tag, returning any error instead of raising it so failures can be aggregated."""
+            options = (f'docker://{tag}',) if engine.program.name == 'podman' else ()
+
+            try:
+                engine.run('manifest', 'push', tag, *options)
+            except SubprocessError as ex:
+                return ex
+
+            self._pushed.add(tag)
 
-                try:
-                    engine.run('manifest', 'push', tag, *options)
-                except SubprocessError as ex:
-                    raise self.ManifestPushError() from ex
+            return None
+
+        if pending := [tag for tag in self.tags if tag not in self._pushed]:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(pending))) as executor:
+                if errors := [error for error in executor.map(push_tag, pending) if error]:
+                    raise self.ManifestPushError() from errors[0]
 
     class ManifestPushError(Exception):
         """An error occurred while pushing a manifest."""
@@ -275,7 +414,7 @@ class Merge(Command):
         However, because the manifest list was created using the original images, it will contain the original digests.
         If the digests differ, the manifest list push will fail because it references digests which do not exist.
         """
-        return self.push and len(set(ImageReference.parse(tag).full_repo for tag in self.tags + self.sources)) > 1
+        return self.push and len({ref.full_repo for ref in map(_parse_image_ref, self.tags + self.sources)}) > 1
 
     def apply_work_around(self) -> None:
         """
@@ -286,9 +425,19 @@ class Merge(Command):
         """
         display.warning('Applying work-around for digest mismatch when using multiple repositories.')
 
-        for source in self.sources:
-            engine.run('pull', source)
-            engine.run('push', source)
+        def run_engine(action: str, source: str) -> t.Optional[SubprocessError]:
+            """Run the given engine action on the given source, returning any error instead of raising it so failures can be aggregated."""
+            try:
+                engine.run(action, source)
+            except SubprocessError as ex:
+                return ex
+
+            return None
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(self.sources))) as executor:
+            for action in ('pull', 'push'):  # pushes wait for all pulls to complete
+                if errors := [error for error in executor.map(functools.partial(run_engine, action), self.sources) if error]:
+                    raise ApplicationError('\n'.join(error.message for error in errors))
 
 
 @dataclasses.dataclass(frozen=True)
@@ -329,7 +478,6 @@ class ContainerEngine:
         """The program used to manage containers."""
         if not self._program:
             self._program = self.detect()
-            self.run('--version')
 
         return self._program
 
@@ -347,7 +495,10 @@ class ContainerEngine:
     @staticmethod
     def detect() -> pathlib.Path:
         """Detect the program used to manage containers."""
-        programs = ('podman', 'docker')
+        programs: tuple[str, ...] = ('podman', 'docker')
+
+        if override := os.environ.get('CONTAINMINT_ENGINE'):
+            programs = (override,)
 
         for program in programs:
             if path := shutil.which(program):
@@ -372,16 +523,85 @@ class ImageReference:
     @classmethod
     def parse(cls, value: str) -> ImageReference:
         """Parse the given value and return an image reference."""
-        server, name = value.split('/', 1)
-        repo, tag = name.split(':', 1)
+        return _parse_image_ref(value)
+
 
-        ref = cls(
-            server=server,
-            repo=repo,
-            tag=tag,
+@functools.lru_cache(maxsize=256)
+def _parse_image_ref(value: str) -> ImageReference:
+    """Parse the given value and return an image reference, caching results since the same tags are parsed repeatedly."""
+    server, name = value.split('/', 1)
+    repo, tag = name.split(':', 1)
+
+    ref = ImageReference(
+        server=server,
+        repo=repo,
+        tag=tag,
+    )
+
+    return ref
+
+
+@dataclasses.dataclass(frozen=True)
+class SshConnection:
+    """SSH connection details for a remote host."""
+
+    host: str
+    user: str
+    port: t.Optional[int]
+    key: t.Optional[str]
+
+    @classmethod
+    def create(cls, inventory_vars: dict[str, t.Any]) -> t.Optional[SshConnection]:
+        """Create and return a connection from the given inventory variables, or None if the required variables are not present."""
+        try:
+            host = inventory_vars['ansible_host']
+            user = inventory_vars['ansible_user']
+        except KeyError:
+            return None
+
+        connection = cls(
+            host=host,
+            user=user,
+            port=inventory_vars.get('ansible_port'),
+            key=inventory_vars.get('ansible_ssh_private_key_file'),
         )
 
-        return ref
+        return connection
+
+    SSH_ARGS = '-o ControlMaster=auto -o ControlPersist=60s -o ControlPath=/tmp/containmint-cm-%r@%h:%p'
+    """Connection multiplexing options, allowing all commands for a host to share a single TCP connection and authentication handshake."""
+
+    @property
+    def options(self) -> list[str]:
+        """Options common to ssh and scp commands."""
+        options = ['-o', 'BatchMode=yes', '-o', 'StrictHostKeyChecking=no', '-o', 'UserKnownHostsFile=/dev/null'] + shlex.split(self.SSH_ARGS)
+
+        if self.key:
+            options.extend(('-i', self.key))
+
+        return options
+
+    def command(self, remote_command: str) -> list[str]:
+        """Return an ssh command which runs the given command on the remote host."""
+        command = ['ssh'] + self.options
+
+        if self.port:
+            command.extend(('-p', str(self.port)))
+
+        command.extend((f'{self.user}@{self.host}', remote_command))
+
+        return command
+
+    def scp_command(self, src: str, dst: str) -> list[str]:
+        """Return an scp command which copies the given local file to the given path on the remote host."""
+        command = ['scp'] + self.options
+
+        if self.port:
+            command.extend(('-P', str(self.port)))
+
+        command.extend((src, f'{self.user}@{self.host}:{dst}'))
+
+        return command
 
 
 @dataclasses.dataclass(frozen=True)
@@ -460,8 +680,8 @@ class AptBootstrapper(Bootstrapper):
     @staticmethod
     def run() -> None:
         """Run the bootstrapper."""
-        apt_env = os.environ.copy()
-        apt_env.update(
+        apt_env = dict(
+            os.environ,
             DEBIAN_FRONTEND='noninteractive',
         )
 
@@ -572,6 +792,9 @@ class Display:
     def __init__(self) -> None:
         self.sensitive: set[str] = set()
 
+        self._pattern: re.Pattern[str] | None = None
+        self._pattern_size = 0
+
     def section(self, message: str) -> None:
         """Print a section message to the console."""
         self.show(f'==> {message}', color=self.BLUE)
@@ -590,10 +813,22 @@ class Display:
 
     def show(self, message: str, color: str | None = None) -> None:
         """Print a message to the console."""
-        for item in self.sensitive:
-            message = message.replace(item, '*' * len(item))
+        if self.sensitive:
+            if len(self.sensitive) != self._pattern_size:  # values are only ever added, so a size check detects staleness
+                self._pattern = re.compile('|'.join(map(re.escape, self.sensitive)))
+                self._pattern_size = len(self.sensitive)
+
+            message = t.cast(re.Pattern, self._pattern).sub(lambda match: '*' * len(match.group()), message)
+
+        print(f'{color or self.CLEAR}{message}{self.CLEAR}')  # buffered; run_command flushes before starting children and atexit flushes at exit
 
-        print(f'{color or self.CLEAR}{message}{self.CLEAR}', flush=True)
+
+def find_compressor() -> pathlib.Path | None:
+    """Return the path to pigz if available, which parallelizes gzip compression across cores, otherwise None to use the built-in gzip support."""
+    if path := shutil.which('pigz'):
+        return pathlib.Path(path)
+
+    return None
 
 
 @contextlib.contextmanager
@@ -615,12 +850,18 @@ def get_server(tags: list[str]) -> str:
 
     Raise an exception if more than one server was found.
     """
-    servers = tuple(sorted(set(ref.server for ref in (ImageReference.parse(tag) for tag in tags))))
+    server = None
+
+    for tag in tags:
+        if (candidate := tag.split('/', 1)[0]) != server:
+            if server is not None:
+                # only build the full sorted set on the error path
+                raise MultipleServersError(tuple(sorted({tag.split('/', 1)[0] for tag in tags})))
 
-    if len(servers) != 1:
-        raise MultipleServersError(servers)
+            server = candidate
 
-    server = servers[0]
+    if server is None:
+        raise MultipleServersError(())
 
     return server
 
@@ -640,16 +881,29 @@ def context_ref(value: str) -> str:
     if not os.path.isdir(value):
         raise argparse.ArgumentTypeError(f'context must be a directory: {value}')
 
-    paths = [os.path.join(value, name) for name in CONTAINER_FILES]
-    matches = [path for path in paths if os.path.isfile(path)]
+    try:
+        find_container_file(value)
+    except ApplicationError as ex:
+        raise argparse.ArgumentTypeError(ex.message) from None
+
+    return value
+
+
+def find_container_file(context: str) -> str:
+    """Return the path of the container file in the given context, which must contain exactly one."""
+    with os.scandir(context) as entries:  # one readdir instead of a stat per candidate name
+        names = {entry.name for entry in entries if entry.is_file()}
+
+    matches = [os.path.join(context, name) for name in CONTAINER_FILES if name in names]
 
     if not matches:
-        raise argparse.ArgumentTypeError(f'missing one of: {" ".join(paths)}')
+        paths = [os.path.join(context, name) for name in CONTAINER_FILES]
+        raise ApplicationError(f'missing one of: {" ".join(paths)}')
 
     if len(matches) > 1:
-        raise argparse.ArgumentTypeError(f'multiple matches: {" ".join(matches)}')
+        raise ApplicationError(f'multiple matches: {" ".join(matches)}')
 
-    return value
+    return matches[0]
 
 
 def key_value(value: str) -> str:
@@ -668,16 +922,22 @@ def run_command(
     capture: bool = False,
 ) -> SubprocessResult:
     """Run the specified command and return the result."""
-    stdin = subprocess.PIPE if data else stdin or subprocess.DEVNULL
-    stdout = subprocess.PIPE if capture else None
-    stderr = subprocess.PIPE if capture else None
-
     display.subsection(f'Run command: {shlex.join(command)}')
+    sys.stdout.flush()  # keep our buffered output ordered ahead of child process output
 
     try:
-        with subprocess.Popen(args=command, stdin=stdin, stdout=stdout, stderr=stderr, env=env, text=True) as process:
-            process_stdout, process_stderr = process.communicate(data)
-            process_status = process.returncode
+        if not capture and data is None:
+            # nothing is piped, so skip Popen+communicate and the text-mode decoding it would perform
+            process_status = subprocess.run(args=command, stdin=stdin or subprocess.DEVNULL, env=env, check=False).returncode
+            process_stdout = process_stderr = ''
+        else:
+            stdin = subprocess.PIPE if data else stdin or subprocess.DEVNULL
+            stdout = subprocess.PIPE if capture else None
+            stderr = subprocess.PIPE if capture else None
+
+            with subprocess.Popen(args=command, stdin=stdin, stdout=stdout, stderr=stderr, env=env, text=True) as process:
+                process_stdout, process_stderr = process.communicate(data)
+                process_status = process.returncode
     except FileNotFoundError:
         raise ProgramNotFoundError(command[0]) from None
 
@@ -688,7 +948,7 @@ def run_command(
         status=process_status,
     )
 
-    if process.returncode != 0:
+    if process_status != 0:
         raise SubprocessError(result)
 
     return result
@@ -713,8 +973,18 @@ def parse_args() -> Command:
     common_build_parser.add_argument('--squash', choices=['new', 'all'], help='squash to a single layer (choices: %(choices)s)')
     common_build_parser.add_argument('--build-arg', metavar='K=V', type=key_value, dest='build_args', action='append', help='build arg passed to the builder')
 
+    cache_group = common_build_parser.add_mutually_exclusive_group()
+    cache_group.add_argument('--cache', action='store_false', dest='no_cache', default=None, help='use the engine build cache')
+    cache_group.add_argument(
+        '--no-cache', action='store_true', dest='no_cache', default=None, help='do not use the engine build cache (default unless --keep-instance)'
+    )
+
     build_parser = subparsers.add_parser(Build.cli_name(), parents=[common_build_parser], description=Build.__doc__, help=Build.__doc__)
     build_parser.add_argument('--keep-instance', action='store_true', help='keep the remote instance')
+    build_parser.add_argument(
+        '--compress-level', type=int, choices=range(10), metavar='{0-9}', default=6, help='payload compression level, 0 for none (default: %(default)s)'
+    )
+    build_parser.add_argument('--no-stream', action='store_false', dest='stream', help='upload the payload with ansible instead of streaming over ssh')
     build_parser.add_argument('--remote', default='ubuntu/22.04', help='ansible-test remote target args')
     build_parser.add_argument('--arch', metavar='ARCH', default='x86_64', choices=['x86_64', 'aarch64'], help='architecture (choices: %(choices)s)')
     build_parser.set_defaults(command_type=Build)
@@ -748,9 +1018,9 @@ def main() -> None:
     """Main program entry point."""
     try:
         command = parse_args()
-        display.section(f'Begin: {command.cli_name()}({command.__dict__})')
+        display.section(f'Begin: {command.cli_name()}({command.state})')
         command.run()
-        display.section(f'End: {command.cli_name()}({command.__dict__})')
+        display.section(f'End: {command.cli_name()}({command.state})')
     except ApplicationError as ex:
         display.fatal(ex.message)
         sys.exit(1)
@@ -759,5 +1029,14 @@ def main() -> None:
 display = Display()
 engine = ContainerEngine()
 
+
+def _flush_stdout() -> None:
+    """Flush stdout at exit, tolerating a stream already closed by the host environment."""
+    with contextlib.suppress(ValueError):
+        sys.stdout.flush()
+
+
+atexit.register(_flush_stdout)
+
 if __name__ == '__main__':
     main()
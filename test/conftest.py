@@ -4,10 +4,120 @@
 
 from __future__ import annotations
 
+import dataclasses
+import functools
 import os
+import pathlib
+import re
+import typing as t
 
 import pytest
 
+import containmint
+
+ARCHITECTURES = (
+    'x86_64',
+    'aarch64',
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class Config:
+    """Test configuration."""
+
+    scratch_repo: str
+    final_repo: str
+
+    def __post_init__(self):
+        assert self.scratch_repo != self.final_repo  # manifest push behavior can change when images reside in a different repository
+
+    def merge_tag(self, remote: str) -> str:
+        """Return a final tag for merge tests to push from the specified remote."""
+        return f'{self.final_repo}:test_merge-{make_tag(remote)}'
+
+    def merge_sources(self, remote: str) -> dict[str, str]:
+        """Return scratch sources for merge tests to use for each architecture."""
+        return {self.build_tag(remote, arch): arch for arch in ARCHITECTURES}
+
+    def build_tag(self, remote: str, arch: str) -> str:
+        """Return a scratch tag for build tests to push from the specified remote using the given architecture."""
+        return f'{self.scratch_repo}:test_build-{make_tag(remote)}-{arch}'
+
+    @property
+    def execute_tag(self) -> str:
+        """Return a scratch tag for execute tests to push."""
+        return f'{self.scratch_repo}:test_execute'
+
+
+@dataclasses.dataclass(frozen=True)
+class Credentials:
+    """Test credentials."""
+
+    username: str
+    password: str
+
+    @property
+    def env(self) -> dict[str, str]:
+        """Environment variables containing the credentials."""
+        return dict(
+            CONTAINMINT_USERNAME=self.username,
+            CONTAINMINT_PASSWORD=self.password,
+        )
+
+
+@pytest.fixture(name='config', scope='session')
+def _config() -> Config:
+    """Return test configuration."""
+    try:
+        return Config(
+            scratch_repo=os.environ['TEST_SCRATCH_REPO'],
+            final_repo=os.environ['TEST_FINAL_REPO'],
+        )
+    except KeyError as ex:  # pragma: no cover
+        raise pytest.skip(f'Missing environment variable: {ex.args[0]}')
+
+
+@pytest.fixture(name='credentials', scope='session')
+def _credentials() -> Credentials:
+    """Return test credentials."""
+    try:
+        return Credentials(
+            username=os.environ['TEST_USERNAME'],
+            password=os.environ['TEST_PASSWORD'],
+        )
+    except KeyError as ex:  # pragma: no cover
+        raise pytest.skip(f'Missing environment variable: {ex.args[0]}')
+
+
+@pytest.fixture(scope='session')
+def local_engine() -> pathlib.Path:
+    """Return the local container engine program, probed once per session."""
+    return containmint.engine.program
+
+
+@pytest.fixture(name='with_credentials')
+def _with_credentials(credentials: Credentials) -> t.Iterator[None]:
+    """Set the credential environment variables, restoring only those keys on teardown instead of snapshotting the entire environment."""
+    old = {key: os.environ.get(key) for key in credentials.env}
+    os.environ.update(credentials.env)
+
+    yield
+
+    for key, value in old.items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+_TAG_RE = re.compile('[^a-zA-Z0-9_.-]+')
+
+
+@functools.lru_cache(maxsize=None)
+def make_tag(value: str) -> str:
+    """Return the given value with substitutions performed to make it suitable for use in a tag."""
+    return _TAG_RE.sub('-', value)
+
 
 @pytest.fixture(autouse=True, scope='session')
 def environment() -> None:
@@ -23,14 +133,15 @@ def environment() -> None:
 
 def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
     """Apply markers to test functions based on fixture usage."""
-    marks = (
-        'config',
-        'credentials',
-        'remote',
-    )
+    marks = {
+        'config': 'config',
+        'credentials': 'credentials',
+        'remote': 'remote',
+        'provisioned_remotes': 'remote',
+    }
 
     for item in items:
         if isinstance(item, pytest.Function):  # pragma: no branch
             for fixture_name in item.fixturenames:
-                if fixture_name in marks:
-                    item.add_marker(fixture_name)
+                if mark := marks.get(fixture_name):
+                    item.add_marker(mark)
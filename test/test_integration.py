@@ -4,26 +4,30 @@
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
-import dataclasses
+import functools
 import json
 import logging
 import os
-import re
+import pathlib
+import selectors
 import shlex
 import subprocess
+import sys
 import time
 import typing as t
 import unittest.mock
 
 import pytest
+from conftest import ARCHITECTURES, Config, Credentials
 
 import containmint
 
-ARCHITECTURES = (
-    'x86_64',
-    'aarch64',
-)
+try:
+    import ijson  # stream-count JSON entries without materializing the whole document
+except ImportError:  # pragma: no cover
+    ijson = None
 
 REMOTES = (
     'ubuntu/22.04',
@@ -33,79 +37,22 @@ REMOTES = (
 
 SQUASH_TYPES = (None, 'all', 'new')
 
+log = logging.getLogger(__name__)
 
-@dataclasses.dataclass(frozen=True)
-class Config:
-    """Test configuration."""
-
-    scratch_repo: str
-    final_repo: str
-
-    def __post_init__(self):
-        assert self.scratch_repo != self.final_repo  # manifest push behavior can change when images reside in a different repository
-
-    def merge_tag(self, remote: str) -> str:
-        """Return a final tag for merge tests to push from the specified remote."""
-        return f'{self.final_repo}:test_merge-{make_tag(remote)}'
-
-    def merge_sources(self, remote: str) -> dict[str, str]:
-        """Return scratch sources for merge tests to use for each architecture."""
-        return {self.build_tag(remote, arch): arch for arch in ARCHITECTURES}
-
-    def build_tag(self, remote: str, arch: str) -> str:
-        """Return a scratch tag for build tests to push from the specified remote using the given architecture."""
-        return f'{self.scratch_repo}:test_build-{make_tag(remote)}-{arch}'
-
-    @property
-    def execute_tag(self) -> str:
-        """Return a scratch tag for execute tests to push."""
-        return f'{self.scratch_repo}:test_execute'
-
-
-@pytest.fixture(name='config', scope='session')
-def _config() -> Config:
-    """Return test configuration."""
-    try:
-        return Config(
-            scratch_repo=os.environ['TEST_SCRATCH_REPO'],
-            final_repo=os.environ['TEST_FINAL_REPO'],
-        )
-    except KeyError as ex:  # pragma: no cover
-        raise pytest.skip(f'Missing environment variable: {ex.args[0]}')
-
-
-@dataclasses.dataclass(frozen=True)
-class Credentials:
-    """Test credentials."""
-
-    username: str
-    password: str
-
-    @property
-    def env(self) -> dict[str, str]:
-        """Environment variables containing the credentials."""
-        return dict(
-            CONTAINMINT_USERNAME=self.username,
-            CONTAINMINT_PASSWORD=self.password,
-        )
-
-
-@pytest.fixture(name='credentials', scope='session')
-def _credentials() -> Credentials:
-    """Return test credentials."""
-    try:
-        return Credentials(
-            username=os.environ['TEST_USERNAME'],
-            password=os.environ['TEST_PASSWORD'],
-        )
-    except KeyError as ex:  # pragma: no cover
-        raise pytest.skip(f'Missing environment variable: {ex.args[0]}')
+# expected error message fragments, shared with the assertions below so the literals live in one place
+MISSING_FILE_MSG = 'missing one of: '
+MULTIPLE_MATCHES_MSG = 'multiple matches: '
+CONTEXT_DIR_MSG = 'context must be a directory: '
+MISSING_ENV_MSG = 'Missing environment variable: '
+INVALID_TAG_MSG = 'required format is: '
+CONFIG_ERROR_MSG = 'Configuration error: '
 
 
-@pytest.mark.remote
-def test_provision() -> None:
-    """Provision remote instances in parallel to speed up test execution later."""
+@pytest.fixture(name='provisioned_remotes', scope='session')
+def _provisioned_remotes() -> dict[str, bool]:
+    """Provision remote instances in parallel once per session, before the first test that needs them."""
     errors = 0
+    ready: dict[str, bool] = {}
 
     with contextlib.ExitStack() as stack:
         # noinspection PyTypeChecker
@@ -115,7 +62,8 @@ def test_provision() -> None:
             for arch in ARCHITECTURES:
                 args = ('ansible-test', 'shell', '--target-posix', f'remote:{remote},arch={arch}', 'id')
 
-                logging.debug('>>> %s', shlex.join(args))
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug('>>> %s', shlex.join(args))
 
                 # noinspection PyTypeChecker
                 jobs[f'{remote} ({arch})'] = stack.enter_context(
@@ -127,26 +75,53 @@ def test_provision() -> None:
                     )
                 )
 
-        while jobs:
-            time.sleep(1)
+        def reap(name: str, process: subprocess.Popen) -> None:
+            """Record the result of a completed job."""
+            nonlocal errors
 
-            for name, process in tuple(jobs.items()):
-                if process.poll() is not None:
-                    del jobs[name]
+            ready[name] = not process.returncode
 
-                    if process.returncode:  # pragma: no cover
-                        logging.error('Instance failed (%d): %s', process.returncode, name)
-                        errors += 1
-                    else:
-                        logging.debug('Instance ready: %s', name)
+            if process.returncode:  # pragma: no cover
+                logging.error('Instance failed (%d): %s', process.returncode, name)
+                errors += 1
+            else:
+                logging.debug('Instance ready: %s', name)
 
-    assert not errors
+        if hasattr(os, 'pidfd_open'):
+            # wait on all jobs at once, reaping each one the instant it exits instead of on a 1-second polling cycle
+            with selectors.DefaultSelector() as selector:
+                for name, process in jobs.items():
+                    selector.register(os.pidfd_open(process.pid), selectors.EVENT_READ, (name, process))
 
+                while selector.get_map():
+                    for key, _event in selector.select():
+                        selector.unregister(key.fd)
+                        os.close(key.fd)
 
+                        name, process = key.data
+                        process.wait()
+                        reap(name, process)
+        else:  # pragma: no cover
+            while jobs:
+                time.sleep(1)
+
+                for name, process in tuple(jobs.items()):
+                    if process.poll() is not None:
+                        del jobs[name]
+                        reap(name, process)
+
+    if errors:  # pragma: no cover
+        pytest.fail(f'Failed to provision {errors} instance(s)')
+
+    return ready
+
+
+@pytest.mark.xdist_group('merge')  # the merge tests consume the tags pushed here, so they must run after the builds on the same worker
 @pytest.mark.parametrize('arch', ARCHITECTURES)
 @pytest.mark.parametrize('remote', REMOTES, ids=[f'on:{remote}' for remote in REMOTES])
 @pytest.mark.parametrize('squash', SQUASH_TYPES, ids=[f'squash:{squash_type}' for squash_type in SQUASH_TYPES])
-def test_build(config: Config, credentials: Credentials, remote: str, arch: str, squash: t.Optional[str]) -> None:
+@pytest.mark.usefixtures('with_credentials', 'provisioned_remotes')
+def test_build(config: Config, local_engine: pathlib.Path, remote: str, arch: str, squash: t.Optional[str]) -> None:
     """Run the 'build' command with the '--push' option."""
     new_container_ctx = 'test/contexts/simple'
     new_container_file = os.path.join(new_container_ctx, 'Containerfile')
@@ -164,7 +139,7 @@ def test_build(config: Config, credentials: Credentials, remote: str, arch: str,
     # if we expect squash to fail, wire up an assertion to verify, otherwise a no-op nullcontext
     err_assert = t.cast(t.ContextManager, pytest.raises(subprocess.CalledProcessError)) if squash and not squash_supported else contextlib.nullcontext()
 
-    with unittest.mock.patch.dict(os.environ, credentials.env), err_assert as err_context:
+    with err_assert as err_context:
         run_containmint('build', '--tag', tag, '--arch', arch, '--remote', remote, '--context', new_container_ctx, '--push', '--keep-instance', *squash_args)
 
     # if the remote process failed, poke at the output (merged to stdout) to ensure it failed for the right reason
@@ -173,14 +148,17 @@ def test_build(config: Config, credentials: Credentials, remote: str, arch: str,
 
     # validate non-zero-size layer counts against base image to ensure the squash (or lack thereof) resulted in the expected number of layers
     if not squash or squash_supported:
-        local_engine = containmint.engine.program
 
-        proc = run(str(local_engine), 'history', '--format', '{{json .}}', '--human=false', get_base_image_from_container_file(new_container_file))
-        data = f'[{",".join(proc.stdout.splitlines())}]' if local_engine.name == 'docker' else proc.stdout
-        base_layer_count = len([layer for layer in json.loads(data) if layer.get('size', int(layer.get('Size', 0))) > 0])
+        async def probe_layers() -> tuple[int, int]:
+            """Probe the base image and the pushed manifest concurrently."""
+            base_count, proc = await asyncio.gather(
+                get_base_layer_count(str(local_engine), get_base_image_from_container_file(new_container_file)),
+                arun(str(local_engine), 'manifest', 'inspect', *(('--log-level=error',) if local_engine.name == 'podman' else ()), tag),
+            )
 
-        proc = run(str(local_engine), 'manifest', 'inspect', *(('--log-level=error',) if local_engine.name == 'podman' else ()), tag)
-        layer_count = len([layer for layer in json.loads(proc.stdout)['layers'] if layer.get('size', 0) > 0])
+            return base_count, count_manifest_layers(proc.stdout)
+
+        base_layer_count, layer_count = asyncio.run(probe_layers())
 
         if squash == 'new':
             assert layer_count == base_layer_count + 1
@@ -190,6 +168,7 @@ def test_build(config: Config, credentials: Credentials, remote: str, arch: str,
             assert layer_count == base_layer_count + new_container_own_layer_count
 
 
+@pytest.mark.xdist_group('merge')
 @pytest.mark.parametrize('remote', REMOTES, ids=[f'from:{remote}' for remote in REMOTES])
 def test_merge_no_login(config: Config, remote: str) -> None:
     """Run the 'merge' command using already pushed images with the '--no-login' option."""
@@ -199,19 +178,22 @@ def test_merge_no_login(config: Config, remote: str) -> None:
     run_containmint('merge', '--tag', tag, '--no-login', *sources)
 
 
+@pytest.mark.xdist_group('merge')
 @pytest.mark.parametrize('remote', REMOTES, ids=[f'from:{remote}' for remote in REMOTES])
-def test_merge(config: Config, credentials: Credentials, remote: str) -> None:
+@pytest.mark.usefixtures('with_credentials')
+def test_merge(config: Config, remote: str) -> None:
     """Run the 'merge' command using already pushed images with the '--push' option."""
     tag = config.merge_tag(remote)
     sources = config.merge_sources(remote)
 
-    with unittest.mock.patch.dict(os.environ, credentials.env):
-        run_containmint('merge', '--tag', tag, '--push', *sources)
+    run_containmint('merge', '--tag', tag, '--push', *sources)
 
 
+@pytest.mark.xdist_group('merge')
 @pytest.mark.parametrize('builder', REMOTES, ids=[f'from:{remote}' for remote in REMOTES])
 @pytest.mark.parametrize('arch', ARCHITECTURES)
 @pytest.mark.parametrize('remote', REMOTES, ids=[f'on:{remote}' for remote in REMOTES])
+@pytest.mark.usefixtures('provisioned_remotes')
 def test_matrix(config: Config, builder: str, remote: str, arch: str) -> None:
     """Test the 'merge' command result created by a builder using a specific remote and architecture."""
     tag = config.merge_tag(builder)
@@ -222,12 +204,13 @@ def test_matrix(config: Config, builder: str, remote: str, arch: str) -> None:
     run(*ansible_test_shell, containmint.ENGINE_LINK, 'run', tag, 'uname', '-a')
 
 
-def test_execute(config: Config, credentials: Credentials) -> None:
+@pytest.mark.xdist_group('execute')
+@pytest.mark.usefixtures('with_credentials')
+def test_execute(config: Config) -> None:
     """Run the 'execute' command with the '--push' option."""
     scratch = config.execute_tag
 
-    with unittest.mock.patch.dict(os.environ, credentials.env):
-        run_containmint('execute', '--tag', scratch, '--context', 'test/contexts/simple', '--push')
+    run_containmint('execute', '--tag', scratch, '--context', 'test/contexts/simple', '--push')
 
 
 @pytest.mark.parametrize('build_args', [['argwithdefault=overridden'], ['argwithdefault=overridden', 'anotherarg=alsooverridden']])
@@ -251,62 +234,39 @@ def test_execute_no_login() -> None:
     assert 'GOT argwithdefault=default; GOT anotherarg=alsodefault' in proc.stdout
 
 
-def test_execute_empty_context_error() -> None:
-    """Run the 'execute' command with an empty context."""
-    with pytest.raises(subprocess.CalledProcessError) as ex:
-        run_containmint('execute', '--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/empty')
-
-    assert ex.value.returncode == 2
-    assert 'missing one of: ' in ex.value.stdout
-
-
-def test_execute_conflicting_context_error() -> None:
-    """Run the 'execute' command with a conflicting context."""
-    with pytest.raises(subprocess.CalledProcessError) as ex:
-        run_containmint('execute', '--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/conflicting')
-
-    assert ex.value.returncode == 2
-    assert 'multiple matches: ' in ex.value.stdout
-
-
-def test_execute_file_context_error() -> None:
-    """Run the 'execute' command with a file as the context."""
-    with pytest.raises(subprocess.CalledProcessError) as ex:
-        run_containmint('execute', '--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/simple/Containerfile')
-
-    assert ex.value.returncode == 2
-    assert 'context must be a directory: ' in ex.value.stdout
-
-
+@pytest.mark.xdist_group('execute')
 def test_execute_invalid_credentials_error(config: Config) -> None:
     """Run the 'execute' command with invalid credentials."""
     credentials = Credentials(username='invalid', password='invalid')
 
-    with unittest.mock.patch.dict(os.environ, credentials.env):
-        with pytest.raises(subprocess.CalledProcessError) as ex:
-            run_containmint('execute', '--tag', config.execute_tag, '--context', 'test/contexts/simple')
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(unittest.mock.patch.dict(os.environ, credentials.env))
+        ex = stack.enter_context(pytest.raises(subprocess.CalledProcessError))
+
+        run_containmint('execute', '--tag', config.execute_tag, '--context', 'test/contexts/simple')
 
     assert ex.value.returncode == 1
     assert 'username' in ex.value.stdout.lower()
     assert 'password' in ex.value.stdout.lower()
 
 
-def test_execute_missing_credentials_error() -> None:
-    """Run the 'execute' command with missing credentials."""
-    with pytest.raises(subprocess.CalledProcessError) as ex:
-        run_containmint('execute', '--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/simple')
-
-    assert ex.value.returncode == 1
-    assert 'Missing environment variable: ' in ex.value.stdout
-
-
-def test_execute_invalid_tag_error() -> None:
-    """Run the 'execute' command with an invalid tag."""
+@pytest.mark.parametrize(
+    'args, returncode, needle',
+    [
+        pytest.param(('--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/empty'), 2, MISSING_FILE_MSG, id='empty_context'),
+        pytest.param(('--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/conflicting'), 2, MULTIPLE_MATCHES_MSG, id='conflicting_context'),
+        pytest.param(('--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/simple/Containerfile'), 2, CONTEXT_DIR_MSG, id='file_context'),
+        pytest.param(('--tag', 'example.com/repo/name:latest', '--context', 'test/contexts/simple'), 1, MISSING_ENV_MSG, id='missing_credentials'),
+        pytest.param(('--tag', 'invalid', '--context', 'test/contexts/simple'), 2, INVALID_TAG_MSG, id='invalid_tag'),
+    ],
+)
+def test_execute_errors(args: tuple[str, ...], returncode: int, needle: str) -> None:
+    """Run the 'execute' command with invalid input and verify the failure."""
     with pytest.raises(subprocess.CalledProcessError) as ex:
-        run_containmint('execute', '--tag', 'invalid', '--context', 'test/contexts/simple')
+        run_containmint('execute', *args)
 
-    assert ex.value.returncode == 2
-    assert 'required format is: ' in ex.value.stdout
+    assert ex.value.returncode == returncode
+    assert needle in ex.value.stdout
 
 
 def test_dispatch_no_config_error() -> None:
@@ -315,7 +275,7 @@ def test_dispatch_no_config_error() -> None:
         run_containmint('dispatch')
 
     assert ex.value.returncode == 1
-    assert 'Configuration error: ' in ex.value.stdout
+    assert CONFIG_ERROR_MSG in ex.value.stdout
 
 
 def test_merge_multiple_servers_error() -> None:
@@ -329,53 +289,125 @@ def test_merge_multiple_servers_error() -> None:
 
 def run(*args: str, cwd: str | None = None) -> subprocess.CompletedProcess:
     """Run the specified command."""
-    logging.debug('>>> %s', shlex.join(args))
+    if log.isEnabledFor(logging.DEBUG):  # skip quoting every argument when debug logging is off
+        log.debug('>>> %s', shlex.join(args))
 
-    stdout = []
+    buffer = bytearray()
+    pending = b''
 
     try:
         with subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd) as process:
             assert process.stdout
 
-            while line := process.stdout.readline():
-                text = line.decode().rstrip()
-                logging.info('%s', text)
-                stdout.append(f'{text}\n')
+            fd = process.stdout.fileno()
+            log_lines = log.isEnabledFor(logging.INFO)  # checked once, not per chunk
+
+            # read large chunks instead of lines to avoid per-line decode and append overhead on verbose commands
+            while chunk := os.read(fd, 1 << 16):
+                buffer += chunk
+
+                if log_lines:  # skip line splitting entirely when log output is suppressed
+                    pending += chunk
+                    lines = pending.split(b'\n')
+                    pending = lines.pop()  # keep any partial trailing line for the next chunk
+
+                    for line in lines:
+                        log.info('%s', line.decode(errors='replace').rstrip())
+
+            if pending:  # pragma: no cover
+                log.info('%s', pending.decode(errors='replace').rstrip())
 
             process.wait()
     except FileNotFoundError:  # pragma: no cover
         raise Exception(f'Program not found: {args[0]}') from None
 
+    stdout = buffer.decode()  # decode once rather than per line
+
     if process.returncode != 0:
         raise subprocess.CalledProcessError(
             cmd=process.args,
             returncode=process.returncode,
-            output=''.join(stdout),
+            output=stdout,
         )
 
     return subprocess.CompletedProcess(
         args=args,
         returncode=process.returncode,
-        stdout=''.join(stdout),
+        stdout=stdout,
     )
 
 
-def run_containmint(*args: str, cwd: str | None = None) -> subprocess.CompletedProcess:
-    """Run the specified containmint command while collecting code coverage."""
-    return run('coverage', 'run', '-m', 'containmint', *args, cwd=cwd)
+async def arun(*args: str, cwd: str | None = None) -> subprocess.CompletedProcess:
+    """Async variant of run, letting independent commands execute concurrently."""
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug('>>> %s', shlex.join(args))
+
+    process = await asyncio.create_subprocess_exec(*args, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, cwd=cwd)
+    stdout_bytes, _stderr = await process.communicate()
+    stdout = stdout_bytes.decode()
+
+    assert process.returncode is not None  # the process has exited, so communicate has set the return code
+
+    if log.isEnabledFor(logging.INFO):
+        for line in stdout.splitlines():
+            log.info('%s', line)
+
+    if process.returncode:
+        raise subprocess.CalledProcessError(
+            cmd=args,
+            returncode=process.returncode,
+            output=stdout,
+        )
+
+    return subprocess.CompletedProcess(
+        args=args,
+        returncode=process.returncode,
+        stdout=stdout,
+    )
+
 
+def run_containmint(*args: str, cwd: str | None = None) -> subprocess.CompletedProcess:
+    """Run the specified containmint command, collecting code coverage when the test suite itself runs under coverage."""
+    if os.environ.get('COVERAGE_RUN'):  # set by coverage when it runs pytest
+        return run('coverage', 'run', '-m', 'containmint', *args, cwd=cwd)
 
-def make_tag(value: str) -> str:
-    """Return the given value with substitutions performed to make it suitable for use in a tag."""
-    return re.sub('[^a-zA-Z0-9_.-]+', '-', value)
+    # skip the coverage wrapper and its per-invocation startup cost for plain test runs
+    return run(sys.executable, '-m', 'containmint', *args, cwd=cwd)
 
 
+@functools.cache
 def get_base_image_from_container_file(path: str) -> str:
     """Return the first image ref FROM base image from the specified container file."""
-    img_re = re.compile(r'^FROM (.+)$', flags=re.MULTILINE)
-
     with open(path, 'r', encoding='UTF-8') as reader:
-        match = img_re.search(reader.read())
+        for line in reader:
+            if line.startswith('FROM '):
+                return line[5:].strip()
+
+    raise AssertionError(f'No FROM found in: {path}')  # pragma: no cover
+
+
+_base_layer_counts: dict[tuple[str, str], int] = {}
+
+
+async def get_base_layer_count(engine: str, image: str) -> int:
+    """Return the number of non-empty layers in the given base image, querying the engine once per (engine, image) pair."""
+    if (count := _base_layer_counts.get((engine, image))) is None:
+        proc = await arun(engine, 'history', '--format', '{{json .}}', '--human=false', image)
+        data = f'[{",".join(proc.stdout.splitlines())}]' if os.path.basename(engine) == 'docker' else proc.stdout
+
+        if ijson:
+            count = sum(1 for layer in ijson.items(data.encode(), 'item') if layer.get('size', int(layer.get('Size', 0))) > 0)
+        else:  # pragma: no cover
+            count = len([layer for layer in json.loads(data) if layer.get('size', int(layer.get('Size', 0))) > 0])
+
+        _base_layer_counts[(engine, image)] = count
+
+    return count
+
+
+def count_manifest_layers(data: str) -> int:
+    """Return the number of non-empty layers in the given manifest inspect output."""
+    if ijson:
+        return sum(1 for size in ijson.items(data.encode(), 'layers.item.size') if size > 0)
 
-    assert match
-    return match.group(1)
+    return len([layer for layer in json.loads(data)['layers'] if layer.get('size', 0) > 0])  # pragma: no cover
@@ -29,6 +29,7 @@ def test_execute_serialization():
         login=False,
         squash='all',
         build_args=['foo=bar', 'baz=blar'],
+        no_cache=None,
     )
 
     with tempfile.NamedTemporaryFile(prefix='config-', suffix='.json') as config_file: